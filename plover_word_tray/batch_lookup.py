@@ -0,0 +1,219 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import re
+import sys
+
+from functools import lru_cache
+from typing import Iterator, List, Optional, TextIO, Tuple, Dict, Any
+
+from plover import system
+from plover.config import Config
+from plover.dictionary.base import load_dictionary
+from plover.oslayer.config import CONFIG_FILE
+from plover.registry import registry
+
+from plover_word_tray.pseudo import format_pseudo
+from plover_word_tray.sorting import SortingType, sort_suggestions
+from plover_word_tray.translation_index import TranslationIndex, QueryFilter, build_index
+
+
+OUTLINE_TYPE = Tuple[str, ...]
+RESULT_TYPE = Tuple[str, List[Tuple[str, OUTLINE_TYPE, OUTLINE_TYPE]]]
+
+WORD_REGEX = re.compile(r"\w+(?:['’-]\w+)*")
+
+BATCH_SIZE = 4096
+CACHE_SIZE = 65536
+
+# Set in the parent before the pool starts, so forked workers share it
+_state: Optional["LookupState"] = None
+
+
+class LookupState:
+    def __init__(self, options: Dict[str, Any]) -> None:
+        self.options = options
+
+        registry.update()
+
+        # The Plover config is only needed for what isn't given
+        config = None
+        if not (options["system"] and options["dictionaries"]):
+            config = Config(options["config"])
+            config.load()
+
+        system_name = options["system"] or config["system_name"]
+        system.setup(system_name)
+        system_mod = registry.get_plugin("system", system_name).obj
+
+        if options["dictionaries"]:
+            paths = options["dictionaries"]
+        else:
+            paths = [d.path for d in config["dictionaries"] if d.enabled]
+
+        self.index: TranslationIndex = build_index(
+            [load_dictionary(path) for path in paths],
+            strip_accents=not options["keep_accents"],
+            stroke_formatter=getattr(system_mod, "WT_STROKE_FORMATTER", None),
+            translation_formatter=getattr(system_mod, "WT_TRANSLATION_FORMATTER", None)
+        )
+        self.query_filter: QueryFilter = self.index.make_filter(
+            tolerance=options["tolerance"],
+            max_strokes=options["max_strokes"]
+        )
+        self.sorter = getattr(system_mod, "WT_SORTER", None)
+        self.lookup = lru_cache(maxsize=CACHE_SIZE)(self._lookup)
+
+    def _lookup(self, word: str) -> List[Tuple[str, OUTLINE_TYPE, OUTLINE_TYPE]]:
+        suggestions = sort_suggestions(
+            suggestions=self.index.lookup(word, self.query_filter),
+            sorting_type=SortingType[self.options["sorting"]],
+            to_pseudo=False,
+            last_outline=tuple(),
+            system_sorter=self.sorter,
+            limit=self.options["count"]
+        )
+
+        if not self.options["pseudo"]:
+            return suggestions
+
+        return [(tl, ol, format_pseudo(ol, tl)) for tl, ol, _ in suggestions]
+
+
+def init_worker(options: Dict[str, Any]) -> None:
+    global _state
+    if _state is None:
+        _state = LookupState(options)
+
+
+def lookup_word(word: str) -> RESULT_TYPE:
+    return word, _state.lookup(word)
+
+
+def iter_words(input_file: TextIO, word_list: bool) -> Iterator[str]:
+    for line in input_file:
+        if word_list:
+            word = line.strip()
+            if word:
+                yield word
+        else:
+            yield from WORD_REGEX.findall(line)
+
+
+def tsv_field(text: str) -> str:
+    # Translations can hold tabs and newlines, like {^\n^}
+    return text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+def write_result(output: TextIO, result: RESULT_TYPE, output_format: str) -> None:
+    word, suggestions = result
+
+    if output_format == "json":
+        output.write(json.dumps({
+            "word": word,
+            "outlines": [
+                {
+                    "translation": tl,
+                    "outline": "/".join(ol),
+                    "strokes": len(ol),
+                    "pseudo": "/".join(pseudo) if pseudo else None
+                }
+                for tl, ol, pseudo in suggestions
+            ]
+        }, ensure_ascii=False) + "\n")
+        return
+
+    if not suggestions:
+        output.write(f"{word}\t\t\t\t\n")
+
+    for rank, (tl, ol, pseudo) in enumerate(suggestions, 1):
+        output.write(f"{word}\t{rank}\t{tsv_field(tl)}\t{'/'.join(ol)}\t{'/'.join(pseudo)}\n")
+
+
+def parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="plover_word_tray_lookup",
+        description="Look up the best outlines for every word in a text file or word list."
+    )
+    parser.add_argument("input", nargs="?", default="-", help="text file to read, - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="file to write, - for stdout")
+    parser.add_argument("-f", "--format", choices=["tsv", "json"], default="tsv")
+    parser.add_argument("-w", "--word-list", action="store_true", help="read one word or phrase per line")
+    parser.add_argument("-n", "--count", type=int, default=3, help="outlines per word")
+    parser.add_argument("-p", "--pseudo", action="store_true", help="include pseudosteno")
+    parser.add_argument(
+        "-s", "--sorting",
+        choices=[t.name for t in SortingType if t != SortingType.LEARNED],
+        default=SortingType.STROKE_COUNT.name
+    )
+    parser.add_argument("-t", "--tolerance", type=int, default=1)
+    parser.add_argument("-m", "--max-strokes", type=int, default=0)
+    parser.add_argument("--keep-accents", action="store_true")
+    parser.add_argument("-d", "--dictionary", action="append", dest="dictionaries",
+                        help="dictionary to load instead of the ones in the Plover config")
+    parser.add_argument("--system", help="steno system instead of the one in the Plover config")
+    parser.add_argument("--config", default=CONFIG_FILE, help="Plover config file")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="worker processes")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    global _state
+
+    args = parse_args(argv)
+    options = {
+        "config": args.config,
+        "system": args.system,
+        "dictionaries": args.dictionaries,
+        "keep_accents": args.keep_accents,
+        "tolerance": args.tolerance,
+        "max_strokes": args.max_strokes,
+        "sorting": args.sorting,
+        "count": args.count,
+        "pseudo": args.pseudo,
+    }
+
+    input_file = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+
+    pool = None
+    if args.jobs > 1 and "fork" in multiprocessing.get_all_start_methods():
+        # Forked workers share the parent's index instead of rebuilding it
+        _state = LookupState(options)
+        pool = multiprocessing.get_context("fork").Pool(args.jobs)
+    elif args.jobs > 1:
+        pool = multiprocessing.Pool(args.jobs, initializer=init_worker, initargs=(options,))
+    else:
+        _state = LookupState(options)
+
+    try:
+        words = iter_words(input_file, args.word_list)
+        # Work in batches, so only one batch is ever held in memory
+        while True:
+            batch = list(itertools.islice(words, BATCH_SIZE))
+            if not batch:
+                break
+
+            if pool is None:
+                results = map(lookup_word, batch)
+            else:
+                results = pool.imap(lookup_word, batch, chunksize=64)
+
+            for result in results:
+                write_result(output, result, args.format)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output is not sys.stdout:
+            output.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
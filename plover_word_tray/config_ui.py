@@ -1,8 +1,13 @@
+import os
+
+from typing import List
+
 from PyQt5.QtWidgets import (
     QDialog, QWidget, QLabel, QSpinBox, QCheckBox,
-    QComboBox, QDialogButtonBox, QGridLayout
+    QComboBox, QDialogButtonBox, QGridLayout,
+    QListWidget, QListWidgetItem
 )
-from PyQt5.QtCore import pyqtSlot
+from PyQt5.QtCore import Qt, pyqtSlot
 
 from plover_word_tray.word_tray_config import WordTrayConfig
 from plover_word_tray.sorting import SortingType, sorting_descriptions
@@ -10,9 +15,15 @@ from plover_word_tray.sorting import SortingType, sorting_descriptions
 
 class ConfigUI(QDialog):
 
-    def __init__(self, temp_config: WordTrayConfig, parent: QWidget = None) -> None:
+    def __init__(
+        self, 
+        temp_config: WordTrayConfig, 
+        dictionary_paths: List[str], 
+        parent: QWidget = None
+    ) -> None:
         super().__init__(parent)
         self.temp_config = temp_config
+        self.dictionary_paths = dictionary_paths
         self.setup_window()
     
     @pyqtSlot()
@@ -47,6 +58,20 @@ class ConfigUI(QDialog):
         self.tolerance_box.setValue(self.temp_config.tolerance)
         self.tolerance_box.setRange(0, 5)
 
+        self.max_strokes_label = QLabel(self)
+        self.max_strokes_label.setText("Maximum Strokes")
+
+        self.max_strokes_box = QSpinBox(self)
+        self.max_strokes_box.setRange(0, 10)
+        self.max_strokes_box.setSpecialValueText("No limit")
+        self.max_strokes_box.setValue(self.temp_config.max_strokes)
+
+        self.strip_accents_label = QLabel(self)
+        self.strip_accents_label.setText("Ignore Accents")
+
+        self.strip_accents_box = QCheckBox(self)
+        self.strip_accents_box.setChecked(self.temp_config.strip_accents)
+
         self.row_height_label = QLabel(self)
         self.row_height_label.setText("Row Height")
 
@@ -61,6 +86,21 @@ class ConfigUI(QDialog):
         self.page_len_box.setValue(self.temp_config.page_len)
         self.page_len_box.setRange(1, 30)
 
+        self.unload_after_label = QLabel(self)
+        self.unload_after_label.setText("Unload When Hidden")
+
+        self.unload_after_box = QSpinBox(self)
+        self.unload_after_box.setRange(0, 240)
+        self.unload_after_box.setSpecialValueText("Never")
+        self.unload_after_box.setSuffix(" min")
+        self.unload_after_box.setValue(self.temp_config.unload_after)
+
+        self.prefetch_label = QLabel(self)
+        self.prefetch_label.setText("Prefetch Suggestions")
+
+        self.prefetch_box = QCheckBox(self)
+        self.prefetch_box.setChecked(self.temp_config.prefetch)
+
         self.sorting_type_label = QLabel(self)
         self.sorting_type_label.setText("Display Order")
 
@@ -68,6 +108,21 @@ class ConfigUI(QDialog):
         self.sorting_type_box.addItems(sorting_descriptions)
         self.sorting_type_box.setCurrentIndex(self.temp_config.sorting_type.value)
 
+        self.dictionaries_label = QLabel(self)
+        self.dictionaries_label.setText("Dictionaries")
+
+        self.dictionaries_list = QListWidget(self)
+        for path in self.dictionary_paths:
+            item = QListWidgetItem(os.path.basename(path), self.dictionaries_list)
+            item.setToolTip(path)
+            item.setData(Qt.UserRole, path)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(
+                Qt.Unchecked 
+                if path in self.temp_config.excluded_dictionaries 
+                else Qt.Checked
+            )
+
         self.button_box = QDialogButtonBox(
             (
                 QDialogButtonBox.Cancel | 
@@ -85,13 +140,23 @@ class ConfigUI(QDialog):
         self.layout.addWidget(self.show_both_box, 1, 1)
         self.layout.addWidget(self.tolerance_label, 2, 0)
         self.layout.addWidget(self.tolerance_box, 2, 1)
-        self.layout.addWidget(self.row_height_label, 3, 0)
-        self.layout.addWidget(self.row_height_box, 3, 1)
-        self.layout.addWidget(self.page_len_label, 4, 0)
-        self.layout.addWidget(self.page_len_box, 4, 1)
-        self.layout.addWidget(self.sorting_type_label, 5, 0)
-        self.layout.addWidget(self.sorting_type_box, 5, 1)
-        self.layout.addWidget(self.button_box, 6, 0, 2, 1)
+        self.layout.addWidget(self.max_strokes_label, 3, 0)
+        self.layout.addWidget(self.max_strokes_box, 3, 1)
+        self.layout.addWidget(self.strip_accents_label, 4, 0)
+        self.layout.addWidget(self.strip_accents_box, 4, 1)
+        self.layout.addWidget(self.row_height_label, 5, 0)
+        self.layout.addWidget(self.row_height_box, 5, 1)
+        self.layout.addWidget(self.page_len_label, 6, 0)
+        self.layout.addWidget(self.page_len_box, 6, 1)
+        self.layout.addWidget(self.unload_after_label, 7, 0)
+        self.layout.addWidget(self.unload_after_box, 7, 1)
+        self.layout.addWidget(self.prefetch_label, 8, 0)
+        self.layout.addWidget(self.prefetch_box, 8, 1)
+        self.layout.addWidget(self.sorting_type_label, 9, 0)
+        self.layout.addWidget(self.sorting_type_box, 9, 1)
+        self.layout.addWidget(self.dictionaries_label, 10, 0, 1, 2)
+        self.layout.addWidget(self.dictionaries_list, 11, 0, 1, 2)
+        self.layout.addWidget(self.button_box, 12, 0, 2, 1)
         self.setLayout(self.layout)
 
     def save_settings(self) -> None:
@@ -101,10 +166,26 @@ class ConfigUI(QDialog):
             self.show_both_box.isChecked()
         )
         self.temp_config.tolerance = self.tolerance_box.value()
+        self.temp_config.max_strokes = self.max_strokes_box.value()
+        self.temp_config.strip_accents = self.strip_accents_box.isChecked()
         self.temp_config.row_height = self.row_height_box.value()
         self.temp_config.page_len = self.page_len_box.value()
+        self.temp_config.unload_after = self.unload_after_box.value()
+        self.temp_config.prefetch = self.prefetch_box.isChecked()
         self.temp_config.sorting_type = SortingType(
             self.sorting_type_box.currentIndex()
         )
+
+        # Keep exclusions for dictionaries that aren't loaded right now
+        excluded = [
+            path for path in self.temp_config.excluded_dictionaries
+            if path not in self.dictionary_paths
+        ]
+        for row in range(self.dictionaries_list.count()):
+            item = self.dictionaries_list.item(row)
+            if item.checkState() != Qt.Checked:
+                excluded.append(item.data(Qt.UserRole))
+
+        self.temp_config.excluded_dictionaries = excluded
         
         self.accept()
@@ -0,0 +1,164 @@
+import heapq
+import re
+import time
+
+from typing import Dict, List, Optional, Tuple, Callable
+
+from plover.translation import Translation
+
+
+OUTLINE_TYPE = Tuple[str, ...]
+
+MAX_WORDS = 500
+MAX_PARTS = 32
+MAX_WORD_LEN = 64
+MAX_WORD_ENDS = 4
+
+LEADING_PUNCTUATION = re.compile(r"^[\W_]+")
+
+
+class MissedBrief:
+    __slots__ = ("word", "count", "extra_strokes", "strokes_used", "best_outline")
+
+    def __init__(self, word: str, best_outline: OUTLINE_TYPE) -> None:
+        self.word = word
+        self.count = 0
+        self.extra_strokes = 0
+        self.strokes_used = 0
+        self.best_outline = best_outline
+
+
+class MissedBriefTracker:
+    def __init__(
+        self,
+        lookup: Callable[[str], Optional[OUTLINE_TYPE]],
+        max_words: int = MAX_WORDS
+    ) -> None:
+        # Returns the shortest known outline for a lowercase word
+        self.lookup = lookup
+        self.max_words = max_words
+
+        self._word = ""
+        self._parts: List[Translation] = []
+        self._last_seen: Optional[Translation] = None
+        # Translations that ended recent words, so undoing back to one
+        # doesn't count that word again
+        self._word_ends: List[Translation] = []
+        self._stats: Dict[str, MissedBrief] = {}
+
+        self.words_checked = 0
+        self.update_count = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def update(self, translation: Translation, curr_word: str) -> None:
+        if translation is self._last_seen:
+            return
+
+        start = time.perf_counter()
+        self._update(translation, curr_word)
+        elapsed = time.perf_counter() - start
+
+        self.update_count += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+
+    def _update(self, translation: Translation, curr_word: str) -> None:
+        self._last_seen = translation
+
+        # Undo back into the current word, or into the previous one
+        for index, part in enumerate(self._parts):
+            if part is translation:
+                del self._parts[index + 1:]
+                self._word = curr_word
+                return
+
+        if any(translation is word_end for word_end in self._word_ends):
+            self._parts = []
+            self._word = ""
+            return
+
+        if translation.replaced:
+            self._parts = [
+                part for part in self._parts
+                if not any(part is replaced for replaced in translation.replaced)
+            ]
+
+        formatting = translation.formatting
+        attaches = bool(formatting) and formatting[0].prev_attach
+        text = "".join(action.text for action in formatting if action.text)
+        punctuation = bool(text) and not any(char.isalnum() for char in text)
+
+        if self._parts and (punctuation or not attaches):
+            self._finalize()
+            self._parts = []
+
+        if punctuation:
+            # Ends the word before it without being part of it, or of the next one
+            self._add_word_end(translation)
+            self._word = ""
+            return
+
+        if len(self._parts) < MAX_PARTS:
+            self._parts.append(translation)
+
+        self._word = curr_word
+
+    def _add_word_end(self, translation: Translation) -> None:
+        self._word_ends.append(translation)
+        del self._word_ends[:-MAX_WORD_ENDS]
+
+    def _finalize(self) -> None:
+        self._add_word_end(self._parts[-1])
+        # Leading punctuation, like an opening quote, is part of the next
+        # word's text but not of its strokes
+        word = LEADING_PUNCTUATION.sub("", self._word.lower())
+
+        if not word or len(word) > MAX_WORD_LEN or not word.isalpha():
+            return
+
+        best_outline = self.lookup(word)
+        if best_outline is None:
+            return
+
+        self.words_checked += 1
+        strokes_used = sum(len(part.rtfcre) for part in self._parts)
+        if strokes_used <= len(best_outline):
+            return
+
+        missed = self._stats.get(word)
+        if missed is None:
+            missed = self._stats[word] = MissedBrief(word, best_outline)
+
+        missed.count += 1
+        missed.extra_strokes += strokes_used - len(best_outline)
+        missed.strokes_used = strokes_used
+        missed.best_outline = best_outline
+
+        if len(self._stats) > 2 * self.max_words:
+            self._trim()
+
+    def _trim(self) -> None:
+        kept = heapq.nlargest(
+            self.max_words,
+            self._stats.values(),
+            key=lambda m: m.extra_strokes
+        )
+        self._stats = {m.word: m for m in kept}
+
+    def top_offenders(self, count: int) -> List[MissedBrief]:
+        return heapq.nlargest(
+            count,
+            self._stats.values(),
+            key=lambda m: (m.extra_strokes, m.count)
+        )
+
+    def mean_time(self) -> float:
+        if not self.update_count:
+            return 0.0
+
+        return self.total_time / self.update_count
+
+    def reset(self) -> None:
+        self._stats = {}
+        self.words_checked = 0
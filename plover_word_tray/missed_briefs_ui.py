@@ -0,0 +1,74 @@
+from PyQt5.QtWidgets import (
+    QDialog, QWidget, QLabel, QTableWidget, QTableWidgetItem,
+    QHeaderView, QAbstractItemView, QDialogButtonBox, QGridLayout
+)
+
+from plover_word_tray.missed_briefs import MissedBriefTracker
+
+
+TOP_COUNT = 20
+
+
+class MissedBriefsUI(QDialog):
+
+    def __init__(self, tracker: MissedBriefTracker, parent: QWidget = None) -> None:
+        super().__init__(parent)
+        self.tracker = tracker
+        self.setup_window()
+        self.refresh()
+
+    def setup_window(self) -> None:
+        self.setWindowTitle("Missed Briefs")
+        self.resize(420, 450)
+
+        self.summary_label = QLabel(self)
+
+        self.offenders_table = QTableWidget(self)
+        self.offenders_table.setColumnCount(4)
+        self.offenders_table.setHorizontalHeaderLabels(
+            ["Word", "Times", "Extra Strokes", "Shortest Outline"]
+        )
+        self.offenders_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.offenders_table.verticalHeader().hide()
+        self.offenders_table.setAlternatingRowColors(True)
+        self.offenders_table.setShowGrid(False)
+        self.offenders_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+
+        self.overhead_label = QLabel(self)
+
+        self.button_box = QDialogButtonBox(
+            (
+                QDialogButtonBox.Reset |
+                QDialogButtonBox.Close
+            ),
+            parent=self
+        )
+        self.button_box.rejected.connect(self.reject)
+        self.button_box.button(QDialogButtonBox.Reset).clicked.connect(self.on_reset)
+
+        self.layout = QGridLayout()
+        self.layout.addWidget(self.summary_label, 0, 0)
+        self.layout.addWidget(self.offenders_table, 1, 0)
+        self.layout.addWidget(self.overhead_label, 2, 0)
+        self.layout.addWidget(self.button_box, 3, 0)
+        self.setLayout(self.layout)
+
+    def refresh(self) -> None:
+        offenders = self.tracker.top_offenders(TOP_COUNT)
+
+        self.offenders_table.setRowCount(len(offenders))
+        for index, missed in enumerate(offenders):
+            self.offenders_table.setItem(index, 0, QTableWidgetItem(missed.word))
+            self.offenders_table.setItem(index, 1, QTableWidgetItem(str(missed.count)))
+            self.offenders_table.setItem(index, 2, QTableWidgetItem(str(missed.extra_strokes)))
+            self.offenders_table.setItem(index, 3, QTableWidgetItem("/".join(missed.best_outline)))
+
+        self.summary_label.setText(f"Words checked: {self.tracker.words_checked}")
+        self.overhead_label.setText(
+            f"Overhead per stroke: {self.tracker.mean_time() * 1e6:.1f} µs average, "
+            f"{self.tracker.max_time * 1e6:.1f} µs max"
+        )
+
+    def on_reset(self) -> None:
+        self.tracker.reset()
+        self.refresh()
@@ -0,0 +1,136 @@
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from PyQt5.QtCore import QObject, QTimer
+
+from plover_word_tray.translation_index import TranslationIndex, TranslationNode, QueryFilter
+
+
+OUTLINE_TYPE = Tuple[str, ...]
+PREFETCH_TYPE = Tuple[TranslationNode, List[Tuple[str, OUTLINE_TYPE]], int]
+
+CANDIDATE_COUNT = 3
+START_DELAY = 30
+LATENCY_SAMPLES = 500
+# Prefixes matching more than this take too long to look up in one tick
+MAX_MATCHES = 2000
+
+
+def next_characters(node: TranslationNode, prefix: str, count: int) -> List[str]:
+    # Most common characters following the prefix, weighted by how many
+    # outlines lie under each of them
+    weights: Dict[str, int] = {}
+    prefix_len = len(prefix)
+
+    if node.translation.startswith(prefix) and len(node.translation) > prefix_len:
+        weights[node.translation[prefix_len]] = node.count
+    else:
+        for key, child in node.children.items():
+            if key.startswith(prefix) and len(key) > prefix_len:
+                char = key[prefix_len]
+                weights[char] = weights.get(char, 0) + child.count
+
+    return sorted(weights, key=weights.get, reverse=True)[:count]
+
+
+def percentile(samples: Deque[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class Prefetcher(QObject):
+    def __init__(self, parent: QObject = None) -> None:
+        super().__init__(parent)
+
+        # Runs on the GUI thread, one prefix per timer tick, so a real
+        # stroke is never kept waiting for more than a single small lookup.
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._run_next)
+
+        self._index: Optional[TranslationIndex] = None
+        self._query_filter: Optional[QueryFilter] = None
+        self._pending: List[str] = []
+        self._cache: Dict[str, PREFETCH_TYPE] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.hit_latency: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.miss_latency: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def schedule(
+        self,
+        index: TranslationIndex,
+        query_filter: QueryFilter,
+        node: TranslationNode,
+        prefix: str
+    ) -> None:
+        if index is not self._index or query_filter is not self._query_filter:
+            self._cache = {}
+            self._index = index
+            self._query_filter = query_filter
+
+        candidates = [prefix + c for c in next_characters(node, prefix, CANDIDATE_COUNT)]
+        self._cache = {p: self._cache[p] for p in candidates if p in self._cache}
+        self._pending = [p for p in candidates if p not in self._cache]
+
+        if self._pending:
+            self._timer.start(START_DELAY)
+
+    def cancel(self) -> None:
+        self._timer.stop()
+        self._pending = []
+
+    def clear(self) -> None:
+        self.cancel()
+        self._cache = {}
+        self._index = None
+        self._query_filter = None
+
+    def take(
+        self,
+        index: TranslationIndex,
+        query_filter: QueryFilter,
+        prefix: str
+    ) -> Optional[PREFETCH_TYPE]:
+        if index is not self._index or query_filter is not self._query_filter:
+            return None
+
+        return self._cache.pop(prefix, None)
+
+    def record(self, hit: bool, latency: float) -> None:
+        if hit:
+            self.hits += 1
+            self.hit_latency.append(latency)
+        else:
+            self.misses += 1
+            self.miss_latency.append(latency)
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        if not total:
+            return 0.0
+
+        return self.hits / total
+
+    def _run_next(self) -> None:
+        if not self._pending or self._index is None:
+            return
+
+        prefix = self._pending.pop(0)
+        node = self._index.get_node(prefix)
+        # Cheap: the current word's lookup already counted this subtree
+        match_count = node.count_prefix(prefix, self._query_filter)
+
+        if match_count <= MAX_MATCHES:
+            self._cache[prefix] = (
+                node,
+                node.match_prefix(prefix, self._query_filter),
+                match_count
+            )
+
+        if self._pending:
+            self._timer.start(0)
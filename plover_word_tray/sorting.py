@@ -1,3 +1,5 @@
+import heapq
+
 from enum import Enum
 from typing import Tuple, Union, Callable, Any, List, Optional
 
@@ -15,6 +17,7 @@ class SortingType(Enum):
     STROKE_COUNT = 2
     ALPHABETICAL = 3
     SYSTEM_DEFINED = 4
+    LEARNED = 5
 
 
 sorting_descriptions = [
@@ -22,7 +25,8 @@ sorting_descriptions = [
     "Frequency",
     "Stroke Count",
     "Alphabetical",
-    "System Defined"
+    "System Defined",
+    "Learned"
 ]
 
 
@@ -35,9 +39,20 @@ def to_int(string: str, default: int) -> int:
 
 def get_sorter(
     sorting_type: SortingType, 
-    last_outline: Tuple[str, ...]
+    last_outline: Tuple[str, ...],
+    usage_score: Optional[Callable[[Tuple[str, OUTLINE_TYPE]], float]] = None
 ) -> Callable[[Tuple[str, OUTLINE_TYPE]], Any]:
-    if sorting_type == SortingType.FREQUENCY:
+    if sorting_type == SortingType.LEARNED and usage_score is not None:
+        return lambda s: (
+            -usage_score(s),
+            len(s[0]),
+            s[1] != last_outline,
+            s[0],
+            len(s[1]),
+            s[1]
+        )
+
+    elif sorting_type == SortingType.FREQUENCY:
         if system.ORTHOGRAPHY_WORDS is not None:
             return lambda s: (
                 system.ORTHOGRAPHY_WORDS.get(s[0], 999999), 
@@ -84,28 +99,28 @@ def sort_suggestions(
     sorting_type: SortingType,
     to_pseudo: bool,
     last_outline: Tuple[str, ...],
-    stroke_formatter: Optional[Callable[[str], str]] = None,
-    translation_formatter: Optional[Callable[[str], str]] = None,
     system_sorter: Optional[Callable[[Tuple[str, Tuple[str, ...]]], Any]] = None,
+    usage_score: Optional[Callable[[Tuple[str, OUTLINE_TYPE]], float]] = None,
+    limit: Optional[int] = None,
 ) -> List[Tuple[str, OUTLINE_TYPE]]:
-    formatted_sgns = []
-    for translation, raw_outline in suggestions:
-        if stroke_formatter is not None:
-            raw_outline = tuple(stroke_formatter(s) for s in raw_outline)
-        if translation_formatter is not None:
-            translation = translation_formatter(translation)
-        
-        formatted_sgns.append((translation, raw_outline))
-    
+    # Suggestions have already been through the system's formatters
+    formatted_sgns = suggestions
+
+    # Only the first <limit> suggestions are sorted and returned
+    if limit is not None and limit < len(formatted_sgns):
+        sort_func = lambda sgns, key: heapq.nsmallest(limit, sgns, key=key)
+    else:
+        sort_func = lambda sgns, key: sorted(sgns, key=key)
+
     sorted_sgns = []
     if sorting_type == SortingType.SYSTEM_DEFINED:
         if system_sorter is not None:
-            sorted_sgns = sorted(formatted_sgns, key=system_sorter)
+            sorted_sgns = sort_func(formatted_sgns, system_sorter)
         
         sorting_type = SortingType.LENGTH
     
     if formatted_sgns and not sorted_sgns:
-        sorted_sgns = sorted(formatted_sgns, key=get_sorter(sorting_type, last_outline))
+        sorted_sgns = sort_func(formatted_sgns, get_sorter(sorting_type, last_outline, usage_score))
 
     with_pseudo = []
     for translation, raw_outline in sorted_sgns:
@@ -0,0 +1,440 @@
+import unicodedata
+
+from collections import OrderedDict
+from typing import Dict, Tuple, List, Optional, FrozenSet, Iterable, Callable, Hashable, Any
+
+
+OUTLINE_TYPE = Tuple[str, ...]
+# Raw outline, source id, outline after the system's stroke formatter
+ENTRY_TYPE = Tuple[OUTLINE_TYPE, int, OUTLINE_TYPE]
+
+MAX_LENGTH = 2 ** 31
+
+# Rough memory cap for cached indexes, counted in outlines
+MAX_CACHED_ENTRIES = 1500000
+MAX_CACHED_INDEXES = 4
+
+QUOTE_TABLE = str.maketrans({
+    "\u2018": "'",
+    "\u2019": "'",
+    "\u201a": "'",
+    "\u201b": "'",
+    "\u2032": "'",
+    "\u201c": '"',
+    "\u201d": '"',
+    "\u201e": '"',
+    "\u201f": '"',
+    "\u2033": '"',
+})
+
+
+def normalize_key(text: str, strip_accents: bool = True) -> str:
+    key = text.casefold().translate(QUOTE_TABLE)
+    if not strip_accents:
+        # Still folds ligatures and other compatibility characters
+        return unicodedata.normalize("NFKC", key)
+
+    return "".join(
+        c for c in unicodedata.normalize("NFKD", key)
+        if not unicodedata.combining(c)
+    )
+
+
+def common_prefix(str_x: str, str_y: str) -> str:
+    x_len = len(str_x)
+    y_len = len(str_y)
+    short_len = min(x_len, y_len)
+    for index in range(short_len):
+        if str_x[index] != str_y[index]:
+            return str_x[:index]
+
+    return str_x[:short_len]
+
+
+class QueryFilter:
+    __slots__ = ("tolerance", "max_strokes", "excluded")
+
+    def __init__(
+        self,
+        tolerance: int = 1,
+        max_strokes: int = 0,
+        excluded: FrozenSet[int] = frozenset()
+    ) -> None:
+        self.tolerance = tolerance
+        # 0 means no limit
+        self.max_strokes = max_strokes
+        # Source ids of dictionaries to leave out
+        self.excluded = excluded
+
+    def select(self, entries: List[ENTRY_TYPE]) -> List[OUTLINE_TYPE]:
+        # Entries are sorted by length, so the first included entry
+        # gives the minimum length and we can stop at the first one
+        # that is too long.
+        excluded = self.excluded
+        selected = []
+        max_len = None
+        for outline, source, display_outline in entries:
+            if source in excluded:
+                continue
+
+            if max_len is None:
+                max_len = len(outline) + self.tolerance
+                if self.max_strokes:
+                    max_len = min(max_len, self.max_strokes)
+
+            if len(outline) > max_len:
+                break
+
+            selected.append(display_outline)
+
+        return selected
+
+
+class TranslationNode:
+    def __init__(self, translation: str = "") -> None:
+        self.translation = translation
+
+        # We use a dictionary here to manage translations that are
+        # the same except for capitalization. Every outline is kept,
+        # sorted by length, together with the dictionary it came from.
+        self.outlines: Dict[str, List[ENTRY_TYPE]] = {}
+        # Translations after the system's translation formatter
+        self.display: Dict[str, str] = {}
+        self.children: Dict[str, "TranslationNode"] = {}
+
+        # Shortest outline and number of outlines anywhere in this subtree
+        self.min_length = MAX_LENGTH
+        self.count = 0
+
+        # Number of outlines in this subtree that pass the last filter used
+        self._count_filter: Optional[QueryFilter] = None
+        self._filtered_count = 0
+
+    def add_outline(self, translation: str, entry: ENTRY_TYPE) -> None:
+        outline = entry[0]
+        if not outline:
+            return
+
+        entries = self.outlines.setdefault(translation, [])
+        outline_len = len(outline)
+        position = len(entries)
+        while position and len(entries[position - 1][0]) > outline_len:
+            position -= 1
+
+        entries.insert(position, entry)
+        self.min_length = min(self.min_length, outline_len)
+
+    def add_child(
+        self, 
+        translation: str, 
+        key: str, 
+        entry: ENTRY_TYPE
+    ) -> Optional["TranslationNode"]:
+        # Returns the node that now holds the outline
+        if not entry[0]:
+            return None
+
+        self.min_length = min(self.min_length, len(entry[0]))
+        self.count += 1
+        self._count_filter = None
+
+        if key == self.translation:
+            self.add_outline(translation, entry)
+            return self
+
+        if not self.children:
+            new_node = TranslationNode(key)
+            self.children[key] = new_node
+            return new_node.add_child(translation, key, entry)
+        
+        tl_len = len(self.translation)
+        for child_key in self.children.keys():
+            prefix = common_prefix(child_key, key)
+            if len(prefix) > tl_len:
+                if prefix == child_key:
+                    return self.children[child_key].add_child(translation, key, entry)
+
+                grandchild = self.children.pop(child_key)
+                new_child = TranslationNode(prefix)
+                new_child.children[child_key] = grandchild
+                new_child.min_length = grandchild.min_length
+                new_child.count = grandchild.count
+                self.children[prefix] = new_child
+                return new_child.add_child(translation, key, entry)
+
+        new_node = TranslationNode(key)
+        self.children[key] = new_node
+        return new_node.add_child(translation, key, entry)
+
+    def match_prefix(
+        self, 
+        prefix: str, 
+        query_filter: QueryFilter
+    ) -> List[Tuple[str, OUTLINE_TYPE]]:
+        suggestions_list = []
+
+        if query_filter.max_strokes and self.min_length > query_filter.max_strokes:
+            return suggestions_list
+        
+        if self.translation.startswith(prefix):
+            suggestions_list = [
+                (self.display[tl], ol) 
+                for tl, entries in self.outlines.items() 
+                for ol in query_filter.select(entries)
+            ]
+        
+        for key, node in self.children.items():
+            if key.startswith(prefix):
+                suggestions_list += node.match_prefix(prefix, query_filter)
+
+        return suggestions_list
+
+    def filtered_count(self, query_filter: QueryFilter) -> int:
+        if self._count_filter is query_filter:
+            return self._filtered_count
+
+        count = 0
+        if self.count and not (
+            query_filter.max_strokes and self.min_length > query_filter.max_strokes
+        ):
+            count = sum(len(query_filter.select(entries)) for entries in self.outlines.values())
+            count += sum(node.filtered_count(query_filter) for node in self.children.values())
+
+        self._count_filter = query_filter
+        self._filtered_count = count
+        return count
+
+    def count_prefix(self, prefix: str, query_filter: QueryFilter) -> int:
+        # Same as len(self.match_prefix(prefix, query_filter))
+        if self.translation.startswith(prefix):
+            return self.filtered_count(query_filter)
+
+        return sum(
+            node.filtered_count(query_filter)
+            for key, node in self.children.items()
+            if key.startswith(prefix)
+        )
+
+    def get_node(self, prefix: str) -> "TranslationNode":
+        if self.translation.startswith(prefix):
+            return self
+
+        for key, node in self.children.items():
+            if prefix.startswith(key):
+                return node.get_node(prefix)
+        
+        return self
+
+
+class TranslationIndex:
+    def __init__(
+        self, 
+        strip_accents: bool = True,
+        stroke_formatter: Optional[Callable[[str], str]] = None,
+        translation_formatter: Optional[Callable[[str], str]] = None
+    ) -> None:
+        # The trie answers prefix queries; whole-word queries go straight
+        # to the node holding that word. Both are keyed on normalize(),
+        # which is applied once per entry and once per query.
+        self.tree = TranslationNode()
+        self.exact: Dict[str, TranslationNode] = {}
+        self.strip_accents = strip_accents
+        self.entry_count = 0
+
+        # Formatter output is stored with each entry, so queries don't
+        # have to format anything.
+        self.stroke_formatter = stroke_formatter
+        self.translation_formatter = translation_formatter
+        self._formatted_strokes: Dict[str, str] = {}
+
+        self.sources: List[str] = []
+        self._source_ids: Dict[str, int] = {}
+
+    def normalize(self, text: str) -> str:
+        return normalize_key(text, self.strip_accents)
+
+    def source_id(self, source: str) -> int:
+        if source not in self._source_ids:
+            self._source_ids[source] = len(self.sources)
+            self.sources.append(source)
+
+        return self._source_ids[source]
+
+    def make_filter(
+        self,
+        tolerance: int = 1,
+        max_strokes: int = 0,
+        excluded_sources: Iterable[str] = ()
+    ) -> QueryFilter:
+        excluded = frozenset(
+            self._source_ids[source] for source in excluded_sources
+            if source in self._source_ids
+        )
+        return QueryFilter(tolerance, max_strokes, excluded)
+
+    def format_outline(self, outline: OUTLINE_TYPE) -> OUTLINE_TYPE:
+        if self.stroke_formatter is None:
+            return outline
+
+        # Strokes repeat a lot across outlines, so format each one once
+        formatted = self._formatted_strokes
+        try:
+            return tuple(formatted[stroke] for stroke in outline)
+        except KeyError:
+            for stroke in outline:
+                if stroke not in formatted:
+                    formatted[stroke] = self.stroke_formatter(stroke)
+
+            return tuple(formatted[stroke] for stroke in outline)
+
+    def format_translation(self, translation: str) -> str:
+        if self.translation_formatter is None:
+            return translation
+
+        return self.translation_formatter(translation)
+
+    def set_formatters(
+        self,
+        stroke_formatter: Optional[Callable[[str], str]],
+        translation_formatter: Optional[Callable[[str], str]]
+    ) -> bool:
+        # Returns whether the stored output had to be recomputed
+        if (
+            stroke_formatter is self.stroke_formatter
+            and translation_formatter is self.translation_formatter
+        ):
+            return False
+
+        self.stroke_formatter = stroke_formatter
+        self.translation_formatter = translation_formatter
+        self._formatted_strokes = {}
+
+        for node in self.exact.values():
+            for translation, entries in node.outlines.items():
+                node.display[translation] = self.format_translation(translation)
+                entries[:] = [
+                    (outline, source, self.format_outline(outline))
+                    for outline, source, _ in entries
+                ]
+
+        return True
+
+    def add(self, translation: str, outline: OUTLINE_TYPE, source: str = "") -> None:
+        key = self.normalize(translation)
+        entry = (outline, self.source_id(source), self.format_outline(outline))
+        node = self.tree.add_child(translation, key, entry)
+        if node is None:
+            return
+
+        self.exact[key] = node
+        self.entry_count += 1
+        if translation not in node.display:
+            node.display[translation] = self.format_translation(translation)
+
+    def lookup(
+        self, 
+        word: str, 
+        query_filter: Optional[QueryFilter] = None
+    ) -> List[Tuple[str, OUTLINE_TYPE]]:
+        node = self.exact.get(self.normalize(word))
+        if node is None:
+            return []
+
+        if query_filter is None:
+            return [
+                (node.display[tl], ol) 
+                for tl, entries in node.outlines.items() 
+                for _, _, ol in entries
+            ]
+
+        return [
+            (node.display[tl], ol) 
+            for tl, entries in node.outlines.items() 
+            for ol in query_filter.select(entries)
+        ]
+
+    def shortest(self, word: str) -> Optional[OUTLINE_TYPE]:
+        node = self.exact.get(self.normalize(word))
+        if node is None:
+            return None
+
+        return min(
+            (entries[0][0] for entries in node.outlines.values() if entries),
+            key=len,
+            default=None
+        )
+
+    def get_node(self, prefix: str) -> TranslationNode:
+        # Expects a normalized prefix
+        return self.tree.get_node(prefix)
+
+    def shortest_outlines(self) -> Dict[str, OUTLINE_TYPE]:
+        # shortest() for every word, for keeping around without the index
+        shortest_outlines = {}
+        for key, node in self.exact.items():
+            outline = min(
+                (entries[0][0] for entries in node.outlines.values() if entries),
+                key=len,
+                default=None
+            )
+            if outline is not None:
+                shortest_outlines[key] = outline
+
+        return shortest_outlines
+
+
+def build_index(
+    dictionaries: Iterable[Any],
+    strip_accents: bool = True,
+    stroke_formatter: Optional[Callable[[str], str]] = None,
+    translation_formatter: Optional[Callable[[str], str]] = None
+) -> TranslationIndex:
+    # Takes Plover StenoDictionary objects, highest priority first
+    index = TranslationIndex(
+        strip_accents=strip_accents,
+        stroke_formatter=stroke_formatter,
+        translation_formatter=translation_formatter
+    )
+
+    for dictionary in dictionaries:
+        if dictionary.enabled:
+            for outline, translation in dictionary.items():
+                index.add(translation, outline, dictionary.path)
+
+    return index
+
+
+class IndexCache:
+    def __init__(
+        self, 
+        max_entries: int = MAX_CACHED_ENTRIES, 
+        max_indexes: int = MAX_CACHED_INDEXES
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_indexes = max_indexes
+        # Least recently used first
+        self._indexes: "OrderedDict[Hashable, TranslationIndex]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[TranslationIndex]:
+        index = self._indexes.get(key)
+        if index is not None:
+            self._indexes.move_to_end(key)
+
+        return index
+
+    def put(self, key: Hashable, index: TranslationIndex) -> None:
+        self._indexes[key] = index
+        self._indexes.move_to_end(key)
+
+        # The newest index always stays, even if it is over the cap alone
+        while len(self._indexes) > 1 and (
+            len(self._indexes) > self.max_indexes
+            or self.entry_count() > self.max_entries
+        ):
+            self._indexes.popitem(last=False)
+
+    def entry_count(self) -> int:
+        return sum(index.entry_count for index in self._indexes.values())
+
+    def clear(self) -> None:
+        self._indexes.clear()
@@ -0,0 +1,129 @@
+import json
+import math
+import os
+import threading
+import time
+
+from typing import Dict, Tuple
+
+from plover import log
+
+
+OUTLINE_TYPE = Tuple[str, ...]
+
+HALF_LIFE = 14 * 24 * 60 * 60
+FLUSH_INTERVAL = 30
+
+# Scores are stored relative to an epoch, so that decaying every entry is
+# only needed when pruning, which also moves the epoch forward.
+PRUNE_INTERVAL = 24 * 60 * 60
+# Entries whose decayed score falls below this are dropped when pruning
+MIN_SCORE = 0.01
+
+
+def usage_key(translation: str, outline: OUTLINE_TYPE) -> str:
+    return translation + "\t" + "/".join(outline)
+
+
+class UsageStore:
+    def __init__(
+        self,
+        path: str,
+        half_life: float = HALF_LIFE,
+        flush_interval: float = FLUSH_INTERVAL
+    ) -> None:
+        self.path = path
+        self.flush_interval = flush_interval
+
+        self._rate = math.log(2) / half_life
+        self._epoch = time.time()
+        # Only replaced or changed by the flush thread once it starts
+        self._scores: Dict[str, float] = {}
+        # Uses since the last flush
+        self._recent: Dict[str, float] = {}
+
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+
+        self.load()
+
+        self._thread = threading.Thread(
+            target=self._flush_loop,
+            name="word_tray_usage",
+            daemon=True
+        )
+        self._thread.start()
+
+    def record(self, translation: str, outline: OUTLINE_TYPE) -> None:
+        key = usage_key(translation, outline)
+
+        with self._lock:
+            weight = math.exp(self._rate * (time.time() - self._epoch))
+            self._recent[key] = self._recent.get(key, 0.0) + weight
+
+    def score(self, entry: Tuple[str, OUTLINE_TYPE]) -> float:
+        # Relative to the epoch, which is enough for ranking.
+        key = usage_key(*entry)
+        return self._scores.get(key, 0.0) + self._recent.get(key, 0.0)
+
+    def load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, encoding="utf-8") as usage_file:
+                data = json.load(usage_file)
+
+            self._epoch = float(data["epoch"])
+            self._scores = {k: float(v) for k, v in data["scores"].items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            log.warning("Word Tray: could not read usage data from %s", self.path)
+
+    def flush(self) -> None:
+        now = time.time()
+        prune = now - self._epoch >= PRUNE_INTERVAL
+
+        # Only the swap happens under the lock; merging, pruning and
+        # writing run on this thread while record() carries on.
+        with self._lock:
+            if not self._recent and not prune:
+                return
+
+            recent, self._recent = self._recent, {}
+            epoch = self._epoch
+            if prune:
+                self._epoch = now
+
+        scores = self._scores
+        for key, weight in recent.items():
+            scores[key] = scores.get(key, 0.0) + weight
+
+        if prune:
+            factor = math.exp(-self._rate * (now - epoch))
+            self._scores = scores = {
+                key: score * factor
+                for key, score in scores.items()
+                if score * factor >= MIN_SCORE
+            }
+
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as usage_file:
+                json.dump(
+                    {"epoch": self._epoch, "scores": scores},
+                    usage_file,
+                    separators=(",", ":")
+                )
+            os.replace(temp_path, self.path)
+        except OSError:
+            log.warning("Word Tray: could not write usage data to %s", self.path)
+
+    def close(self) -> None:
+        self._closed.set()
+        self._thread.join(timeout=5)
+
+    def _flush_loop(self) -> None:
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+        self.flush()
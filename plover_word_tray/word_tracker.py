@@ -0,0 +1,148 @@
+from typing import Dict, List, Optional
+
+from plover.formatting import RetroFormatter
+from plover.translation import Translation
+
+
+MAX_FRAMES = 32
+MAX_DELTA = 8
+TAIL_LEN = 256
+FRAGMENT_COUNT = 8
+
+
+class Frame:
+    __slots__ = ("translation", "tail")
+
+    def __init__(self, translation: Translation, tail: str) -> None:
+        self.translation = translation
+        # End of the output text right after this translation
+        self.tail = tail
+
+
+def fragment_word(prev_translations: List[Translation]) -> Optional[str]:
+    # What the tray has always used: the last fragment of the output
+    last_fragment: List[str] = RetroFormatter(prev_translations).last_fragments()
+    if not last_fragment:
+        return None
+
+    return last_fragment[-1].strip()
+
+
+def apply_translation(tail: str, translation: Translation) -> Optional[str]:
+    # Replays the translation's actions on the end of the output text, the
+    # same way RetroFormatter reads them back: the space before an action
+    # is part of the text the action replaces, and trailing_space is never
+    # output. Returns None for anything that can't be replayed from the tail.
+    for action in translation.formatting:
+        if action.text is not None and not action.prev_attach:
+            tail += action.space_char
+
+        if action.prev_replace:
+            if len(action.prev_replace) > len(tail):
+                return None
+            tail = tail[:len(tail) - len(action.prev_replace)]
+
+        if action.text is not None:
+            tail += action.text
+
+    return tail[-TAIL_LEN:]
+
+
+def tail_word(tail: str) -> Optional[str]:
+    # Last fragment of the tail, stripped, matching fragment_word
+    words = tail.split()
+    if not words:
+        return None
+
+    if len(words) == 1 and len(tail) >= TAIL_LEN:
+        # The word may go on past the start of the tail
+        return None
+
+    return words[-1]
+
+
+class WordTracker:
+    def __init__(self) -> None:
+        # Recent translations with the text they left behind, oldest first
+        self._frames: List[Frame] = []
+
+        self.incremental_updates = 0
+        self.full_updates = 0
+
+    def update(self, prev_translations: List[Translation]) -> Optional[str]:
+        # Returns the current word, or None if there is none
+        if not prev_translations:
+            self._frames = []
+            return None
+
+        tail = self._update_tail(prev_translations)
+        word = None if tail is None else tail_word(tail)
+        if word is None:
+            # Empty or all-whitespace output also ends up here, since the
+            # tail alone can't tell it apart from a cut-off word
+            word = self._rebuild(prev_translations)
+            self.full_updates += 1
+        else:
+            self.incremental_updates += 1
+
+        if word is None:
+            return None
+
+        last_translation = prev_translations[-1].english
+        if last_translation is not None:
+            if (
+                last_translation.replace(" ", "").isalnum()
+                and len(last_translation) > len(word)
+            ):
+                word = last_translation.strip()
+
+        return word
+
+    def _update_tail(self, prev_translations: List[Translation]) -> Optional[str]:
+        frames = self._frames
+        positions: Dict[int, int] = {
+            id(frame.translation): index for index, frame in enumerate(frames)
+        }
+
+        # The newest translation we already know about; everything after
+        # it is new, and any frames after it were undone or replaced.
+        base = None
+        for back in range(1, min(len(prev_translations), MAX_DELTA) + 1):
+            translation = prev_translations[-back]
+            index = positions.get(id(translation))
+            if index is not None and frames[index].translation is translation:
+                base = (index, back)
+                break
+
+        if base is None:
+            return None
+
+        index, back = base
+        if (
+            index > 0
+            and back < len(prev_translations)
+            and frames[index - 1].translation is not prev_translations[-back - 1]
+        ):
+            return None
+
+        del frames[index + 1:]
+        tail = frames[index].tail
+        for translation in prev_translations[len(prev_translations) - back + 1:]:
+            tail = apply_translation(tail, translation)
+            if tail is None:
+                return None
+
+            frames.append(Frame(translation, tail))
+
+        del frames[:-MAX_FRAMES]
+        return tail
+
+    def _rebuild(self, prev_translations: List[Translation]) -> Optional[str]:
+        # One RetroFormatter pass for both the tail and the word
+        fragments = RetroFormatter(prev_translations).last_fragments(FRAGMENT_COUNT)
+        self._frames = [Frame(prev_translations[-1], "".join(fragments)[-TAIL_LEN:])]
+
+        if not fragments:
+            return None
+
+        return fragments[-1].strip()
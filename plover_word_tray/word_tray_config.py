@@ -1,3 +1,5 @@
+from copy import copy
+
 from plover_word_tray.sorting import SortingType
 
 
@@ -5,8 +7,13 @@ CONFIG_ITEMS = {
     "to_pseudo": False,
     "show_both": False,
     "tolerance": 1,
+    "max_strokes": 0,
+    "excluded_dictionaries": [],
+    "strip_accents": True,
     "row_height": 30,
     "page_len": 10,
+    "unload_after": 0,
+    "prefetch": True,
     "sorting_type": SortingType.LENGTH
 }
 
@@ -23,5 +30,5 @@ class WordTrayConfig:
                 setattr(self, key, default)
 
     def copy(self) -> "WordTrayConfig":
-        value_dict = {k: getattr(self, k) for k in CONFIG_ITEMS.keys()}
+        value_dict = {k: copy(getattr(self, k)) for k in CONFIG_ITEMS.keys()}
         return WordTrayConfig(value_dict)
@@ -12,3 +12,8 @@ def next_page(translator: Translator, stroke: Stroke, argument: str):
 
 def word_tray_reload(translator: Translator, stroke: Stroke, argument: str):
     translator.word_tray_state = "word_tray_reload"
+
+
+def goto_page(translator: Translator, stroke: Stroke, argument: str):
+    translator.word_tray_state = "goto_page"
+    translator.word_tray_argument = argument
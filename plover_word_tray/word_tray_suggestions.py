@@ -1,131 +1,87 @@
 from PyQt5.QtWidgets import QTableWidgetItem
+from PyQt5.QtCore import QEvent, QTimer
+from PyQt5.QtGui import QShowEvent, QHideEvent
 
-from typing import Dict, Tuple, List, Optional, Any, Callable
+import os
+import time
+
+from typing import Tuple, List, Dict, Optional, Any, Callable, Set, Hashable
 
 from plover import system
 from plover.engine import StenoEngine
-from plover.formatting import RetroFormatter
+from plover.oslayer.config import CONFIG_DIR
 from plover.registry import registry
-from plover.steno_dictionary import StenoDictionary, StenoDictionaryCollection
+from plover.steno_dictionary import StenoDictionaryCollection
 from plover.translation import Translation
 
 from plover_word_tray.word_tray_ui import WordTrayUI
-from plover_word_tray.sorting import sort_suggestions
+from plover_word_tray.sorting import sort_suggestions, to_int
+from plover_word_tray.pseudo import format_pseudo
+from plover_word_tray.usage import UsageStore
+from plover_word_tray.missed_briefs import MissedBriefTracker
+from plover_word_tray.prefetch import Prefetcher, percentile
+from plover_word_tray.word_tracker import WordTracker
+from plover_word_tray.translation_index import (
+    TranslationIndex, TranslationNode, QueryFilter, IndexCache, build_index, normalize_key
+)
 
 
 OUTLINE_TYPE = Tuple[str, ...]
 
-
-def common_prefix(str_x: str, str_y: str) -> str:
-    x_len = len(str_x)
-    y_len = len(str_y)
-    short_len = min(x_len, y_len)
-    for index in range(short_len):
-        if str_x[index] != str_y[index]:
-            return str_x[:index]
-
-    return str_x[:short_len]
-
-
-class TranslationNode:
-    def __init__(self, translation: str = "", tolerance: int = 1) -> None:
-        self.translation = translation
-        self.tolerance = tolerance
-
-        # We use a dictionary here to manage translations that are
-        # the same except for capitalization.
-        self.min_length: Dict[str, int] = {}
-        self.outlines: Dict[str, List[OUTLINE_TYPE]] = {}
-        self.children: Dict[str, "TranslationNode"] = {}
-
-    def add_outline(self, translation: str, outline: OUTLINE_TYPE) -> None:
-        if not outline:
-            return
-        
-        outline_len = len(outline)
-        if translation not in self.min_length:
-            self.min_length[translation] = outline_len
-            self.outlines[translation] = [outline]
-            return
-
-        curr_min_len = self.min_length[translation]
-
-        if outline_len <= curr_min_len + self.tolerance:
-            self.outlines[translation].append(outline)
-
-        if outline_len < self.min_length[translation]:
-            self.min_length[translation] = curr_min_len
-
-            new_max_len = curr_min_len + self.tolerance
-            self.outlines[translation] = [
-                ol for ol in self.outlines[translation]
-                if len(ol) < new_max_len
-            ]
-
-    def add_child(self, translation: str, lower_tl: str, outline: OUTLINE_TYPE) -> None:
-        if not outline:
-            return
-
-        if lower_tl == self.translation:
-            self.add_outline(translation, outline)
-            return
-
-        if not self.children:
-            new_node = TranslationNode(translation, self.tolerance)
-            new_node.add_outline(translation, outline)
-            self.children[lower_tl] = new_node
-            return
-        
-        tl_len = len(self.translation)
-        for key in self.children.keys():
-            prefix = common_prefix(key, lower_tl)
-            if len(prefix) > tl_len:
-                if prefix == key:
-                    self.children[key].add_child(translation, lower_tl, outline)
-                else:
-                    grandchild = self.children.pop(key)
-                    new_child = TranslationNode(prefix, self.tolerance)
-                    new_child.children[key] = grandchild
-                    new_child.add_child(translation, lower_tl, outline)
-                    self.children[prefix] = new_child
-
-                return
-
-        new_node = TranslationNode(lower_tl, self.tolerance)
-        new_node.add_outline(translation, outline)
-        self.children[lower_tl] = new_node
-
-    def match_prefix(self, prefix: str) -> List[Tuple[str, OUTLINE_TYPE]]:
-        suggestions_list = []
-        
-        if self.translation.lower().startswith(prefix):
-            suggestions_list = [(tl, ol) for tl, ols in self.outlines.items() for ol in ols]
-        
-        for key, node in self.children.items():
-            if key.startswith(prefix):
-                suggestions_list += node.match_prefix(prefix)
-
-        return suggestions_list
-
-    def get_node(self, prefix: str) -> "TranslationNode":
-        if self.translation.startswith(prefix):
-            return self
-
-        for key, node in self.children.items():
-            if prefix.startswith(key):
-                return node.get_node(prefix)
-        
-        return self
+USAGE_FILE = os.path.join(CONFIG_DIR, "word_tray_usage.json")
 
 
 class WordTraySuggestions(WordTrayUI):
+    # Read by the window events, which already fire from WordTrayUI.__init__
+    _stale = False
+    _unloaded = False
+    _reload_pending = False
+    _idle_timer: Optional[QTimer] = None
+
     def __init__(self, engine: StenoEngine) -> None:
         super().__init__(engine)
 
-        self._translate_tree = None
-        self._suggestions: List[Tuple[str, OUTLINE_TYPE]] = []
+        self._index: Optional[TranslationIndex] = None
+        self._index_cache = IndexCache()
+        self._index_key: Optional[Hashable] = None
         self._prev_node: Optional[TranslationNode] = None
+        self._prefix = ""
+        self._match_count = 0
         self._page = 0
+        self._page_suggestions: List[Tuple[str, OUTLINE_TYPE, OUTLINE_TYPE]] = []
+        # Matches for the current query, and once paged past the first
+        # page, all of them sorted, so page macros only slice
+        self._sort_key: Optional[Hashable] = None
+        self._raw_suggestions: Optional[List[Tuple[str, OUTLINE_TYPE]]] = None
+        self._sorted_suggestions: Optional[List[Tuple[str, OUTLINE_TYPE, OUTLINE_TYPE]]] = None
+
+        self._word_tracker = WordTracker()
+        self._curr_word = ""
+        self._last_outline: OUTLINE_TYPE = tuple()
+        self._query_filter = QueryFilter()
+
+        # Suggestions aren't computed while the tray can't be seen
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setSingleShot(True)
+        self._idle_timer.timeout.connect(self.on_idle)
+        # Kept while unloaded, so missed briefs are still tracked
+        self._shortest_outlines: Optional[Dict[str, OUTLINE_TYPE]] = None
+
+        self._prefetcher = Prefetcher(self)
+
+        # Plover sends dictionaries_loaded twice on a system switch, first
+        # with only the dictionaries it already had; index the final set once
+        self._dict_update_timer = QTimer(self)
+        self._dict_update_timer.setSingleShot(True)
+        self._dict_update_timer.setInterval(0)
+        self._dict_update_timer.timeout.connect(self.apply_dict_update)
+
+        self._usage = UsageStore(USAGE_FILE)
+        self._suggested: Set[Tuple[str, OUTLINE_TYPE]] = set()
+        self._last_recorded: Optional[Translation] = None
+        self.finished.connect(self._usage.close)
+
+        self.missed_briefs = MissedBriefTracker(self.lookup_shortest)
 
         self._stroke_formatter: Optional[Callable[[str], str]] = None
         self._translation_formatter: Optional[Callable[[str], str]] = None
@@ -134,14 +90,15 @@ class WordTraySuggestions(WordTrayUI):
         engine.signal_connect("stroked", self.on_stroke)
         engine.signal_connect("dictionaries_loaded", self.on_dict_update)
         engine.signal_connect("config_changed", self.on_config_changed)
-        self.index_dictionaries()
         self.on_config_changed()
+        self.index_dictionaries()
 
-    def update_table(self) -> None:
-        top_index = self._page * self.config.page_len
+    def page_count(self) -> int:
+        return (self._match_count - 1) // self.config.page_len + 1
 
-        page_count = (len(self._suggestions) - 1) // self.config.page_len + 1
-        displayed = self._suggestions[top_index:top_index + self.config.page_len]
+    def update_table(self) -> None:
+        page_count = self.page_count()
+        displayed = self._page_suggestions
         display_len = len(displayed)
 
         third_col = self.config.to_pseudo and self.config.show_both
@@ -163,98 +120,374 @@ class WordTraySuggestions(WordTrayUI):
                     self.suggestions_table.setItem(index, 2, QTableWidgetItem(""))
         
         self.page_label.setText(f"Page {self._page + 1} of {page_count}")
+        if self.config.prefetch:
+            self.page_label.setToolTip(self.prefetch_stats())
+
+    def is_tray_visible(self) -> bool:
+        return self.isVisible() and not self.isMinimized()
 
     def on_stroke(self, _: tuple) -> None:
+        self._prefetcher.cancel()
         update_suggestions = True
+        visible = self.is_tray_visible()
 
         if hasattr(self.engine._translator, "word_tray_state"):
             word_tray_state = self.engine._translator.word_tray_state
-            max_pages = (len(self._suggestions) - 1) // self.config.page_len + 1
+            max_pages = self.page_count()
 
-            if word_tray_state == "prev_page":
-                self._page = (self._page - 1) % max_pages
+            # Nothing to page through while hidden or without any matches
+            if (
+                word_tray_state in ("prev_page", "next_page", "goto_page")
+                and (not visible or max_pages == 0)
+            ):
+                update_suggestions = False
+
+            elif word_tray_state == "prev_page":
+                self.load_page((self._page - 1) % max_pages)
                 update_suggestions = False
             
             elif word_tray_state == "next_page":
-                self._page = (self._page + 1) % max_pages
+                self.load_page((self._page + 1) % max_pages)
+                update_suggestions = False
+
+            elif word_tray_state == "goto_page":
+                page = to_int(self.engine._translator.word_tray_argument, 1)
+                self.load_page(max(min(page, max_pages) - 1, 0))
                 update_suggestions = False
             
             elif word_tray_state == "word_tray_reload":
-                self.index_dictionaries()
+                if visible and not self._unloaded:
+                    self.index_dictionaries(force=True)
+                else:
+                    self._reload_pending = True
             
             self.engine._translator.word_tray_state = ""
 
         prev_translations: List[Translation] = self.engine.translator_state.prev()
+        curr_word = self._word_tracker.update(prev_translations)
 
-        if not prev_translations:
+        if curr_word is None:
             return
 
-        retro_formatter: RetroFormatter = RetroFormatter(prev_translations)
-        last_fragment: List[str] = retro_formatter.last_fragments()
+        last_outline = prev_translations[-1].rtfcre
+        # Only suggestions that could be seen count as followed
+        if visible:
+            self.record_usage(prev_translations[-1])
+        self.missed_briefs.update(prev_translations[-1], curr_word)
 
-        if not last_fragment:
+        self.start_idle_timer()
+
+        if not visible:
+            # Only remember the word; it's looked up once the tray is shown
+            if curr_word and update_suggestions:
+                self._curr_word = curr_word
+                self._last_outline = last_outline
+                self._stale = True
             return
 
-        curr_word: str = last_fragment[-1].strip()
-        last_outline = tuple()
+        if curr_word and update_suggestions:
+            self._curr_word = curr_word
+            self._last_outline = last_outline
+            self.refresh_suggestions()
+        
+        self.update_table()
 
-        if prev_translations:
-            last_translation = prev_translations[-1].english
-            last_outline = prev_translations[-1].rtfcre
-            if last_translation is not None:
-                if (
-                    last_translation.replace(" ", "").isalnum()
-                    and len(last_translation) > len(curr_word)
-                ):
-                    curr_word = last_translation.strip()
+    def catch_up(self) -> None:
+        if not self.is_tray_visible():
+            return
 
-        if curr_word and update_suggestions:
-            self.current_translation.setPlainText(curr_word)
-            prefix = curr_word.lower()
+        if self._unloaded or self._reload_pending:
+            self.index_dictionaries(force=self._reload_pending)
+            self._stale = True
 
+        if self._stale:
+            self._stale = False
+            self.refresh_suggestions()
+            self.update_table()
+
+    def showEvent(self, event: QShowEvent) -> None:
+        super().showEvent(event)
+        self.catch_up()
+
+    def hideEvent(self, event: QHideEvent) -> None:
+        super().hideEvent(event)
+        self.start_idle_timer()
+
+    def changeEvent(self, event: QEvent) -> None:
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            if self.isMinimized():
+                self.start_idle_timer()
+            else:
+                self.catch_up()
+
+    def start_idle_timer(self) -> None:
+        if self._idle_timer is not None and self.config.unload_after:
+            self._idle_timer.start(self.config.unload_after * 60000)
+
+    def on_idle(self) -> None:
+        if self.is_tray_visible() or self._index is None:
+            return
+
+        # Drop every index; the next lookup rebuilds the one it needs
+        self._shortest_outlines = self._index.shortest_outlines()
+        self._prefetcher.clear()
+        self._index_cache.clear()
+        self._index = None
+        self._index_key = None
+        self.reset_suggestions()
+        self._unloaded = True
+
+    def refresh_suggestions(self) -> None:
+        if not self._curr_word or self._index is None:
+            return
+
+        start = time.perf_counter()
+        self.current_translation.setPlainText(self._curr_word)
+        prefix = self._index.normalize(self._curr_word)
+
+        prefetched = None
+        if self.config.prefetch:
+            prefetched = self._prefetcher.take(self._index, self._query_filter, prefix)
+
+        raw_suggestions = None
+        if prefetched is not None:
+            tree_node, raw_suggestions, match_count = prefetched
+        else:
             if (
                 self._prev_node is not None 
                 and prefix.startswith(self._prev_node.translation)
             ):
                 tree_node = self._prev_node.get_node(prefix)
-                raw_suggestions = tree_node.match_prefix(prefix)
             else:    
-                tree_node = self._translate_tree.get_node(prefix)
-                raw_suggestions = tree_node.match_prefix(prefix)
+                tree_node = self._index.get_node(prefix)
+
+            match_count = tree_node.count_prefix(prefix, self._query_filter)
+
+        self._prev_node = tree_node
+        self._prefix = prefix
+        self._match_count = match_count
+        self.load_page(0, raw_suggestions)
+
+        if self.config.prefetch:
+            self._prefetcher.record(prefetched is not None, time.perf_counter() - start)
+            self._prefetcher.schedule(self._index, self._query_filter, tree_node, prefix)
+
+    def prefetch_stats(self) -> str:
+        prefetcher = self._prefetcher
+        return (
+            f"Prefetch hit rate: {prefetcher.hit_rate():.0%} "
+            f"({prefetcher.hits} of {prefetcher.hits + prefetcher.misses})\n"
+            f"p95 lookup: {percentile(prefetcher.hit_latency, 0.95) * 1000:.1f} ms on hits, "
+            f"{percentile(prefetcher.miss_latency, 0.95) * 1000:.1f} ms on misses"
+        )
+
+    def reset_suggestions(self) -> None:
+        self._prev_node = None
+        self._match_count = 0
+        self._page_suggestions = []
+        self._sort_key = None
+        self._raw_suggestions = None
+        self._sorted_suggestions = None
+
+    def load_page(
+        self, 
+        page: int, 
+        raw_suggestions: Optional[List[Tuple[str, OUTLINE_TYPE]]] = None
+    ) -> None:
+        # The first page of a query only needs a partial sort; paging past
+        # it sorts everything once, and later pages are sliced from that.
+        # Only the page shown gets converted to pseudosteno.
+        self._page = page
+        if self._prev_node is None or not self._match_count:
+            self._page_suggestions = []
+            self._suggested = set()
+            return
 
-            queued_suggestions = sort_suggestions(
-                suggestions=raw_suggestions,
+        sort_key = (
+            self._prev_node,
+            self._prefix,
+            self._query_filter,
+            self.config.sorting_type,
+            self._last_outline,
+            self._system_sorter
+        )
+        if sort_key != self._sort_key:
+            self._sort_key = sort_key
+            self._raw_suggestions = raw_suggestions
+            self._sorted_suggestions = None
+
+        top_index = page * self.config.page_len
+        end_index = top_index + self.config.page_len
+
+        if self._sorted_suggestions is not None:
+            queued_suggestions = self._sorted_suggestions[top_index:end_index]
+        else:
+            if self._raw_suggestions is None:
+                self._raw_suggestions = self._prev_node.match_prefix(
+                    self._prefix, self._query_filter
+                )
+
+            limit = end_index if page == 0 else None
+            sorted_suggestions = sort_suggestions(
+                suggestions=self._raw_suggestions,
                 sorting_type=self.config.sorting_type,
-                to_pseudo=self.config.to_pseudo,
-                last_outline=last_outline,
-                stroke_formatter=self._stroke_formatter,
-                translation_formatter=self._translation_formatter,
-                system_sorter=self._system_sorter
+                to_pseudo=False,
+                last_outline=self._last_outline,
+                system_sorter=self._system_sorter,
+                usage_score=self._usage.score,
+                limit=limit
             )
 
-            self._prev_node = tree_node
-            self._suggestions = queued_suggestions
-            self._page = 0
-        
-        self.update_table()
+            if limit is None:
+                self._sorted_suggestions = sorted_suggestions
+                self._raw_suggestions = None
+
+            queued_suggestions = sorted_suggestions[top_index:end_index]
+
+        if self.config.to_pseudo:
+            queued_suggestions = [
+                (tl, ol, format_pseudo(ol, tl)) for tl, ol, _ in queued_suggestions
+            ]
+
+        self._page_suggestions = queued_suggestions
+        self._suggested = {(tl, ol) for tl, ol, _ in queued_suggestions}
+
+    def update_query_filter(self) -> None:
+        if self._index is None:
+            return
+
+        self._query_filter = self._index.make_filter(
+            tolerance=self.config.tolerance,
+            max_strokes=self.config.max_strokes,
+            excluded_sources=self.config.excluded_dictionaries
+        )
     
-    def index_dictionaries(self) -> None:
-        self._translate_tree = TranslationNode(tolerance=self.config.tolerance)
+    def record_usage(self, translation: Translation) -> None:
+        # Only count the translation once, even if page macros follow it
+        if (
+            translation is self._last_recorded
+            or translation.english is None
+            or not self._suggested
+        ):
+            return
+
+        self._last_recorded = translation
+
+        # Formatted like the index does, which may be unloaded
+        english = translation.english
+        if self._translation_formatter is not None:
+            english = self._translation_formatter(english)
+
+        outline = translation.rtfcre
+        if self._stroke_formatter is not None:
+            outline = tuple(self._stroke_formatter(stroke) for stroke in outline)
+
+        if (english, outline) in self._suggested:
+            self._usage.record(english, outline)
+
+    def index_key(self) -> Hashable:
+        # Plover updates the timestamps when it reloads a dictionary
+        dictionaries: StenoDictionaryCollection = self.engine.dictionaries
+        return (
+            system.NAME,
+            self.config.strip_accents,
+            tuple((d.path, d.enabled, d.timestamp) for d in dictionaries.dicts)
+        )
+
+    def index_dictionaries(self, force: bool = False) -> None:
+        key = self.index_key()
+        index = None if force else self._index_cache.get(key)
+
+        if index is None:
+            index = self.build_index()
+            self._index_cache.put(key, index)
+        else:
+            index.set_formatters(self._stroke_formatter, self._translation_formatter)
+
+        self._index = index
+        self._index_key = key
+        self._unloaded = False
+        self._reload_pending = False
+        self._shortest_outlines = None
+        self.reset_suggestions()
+        self.update_query_filter()
+
+    def build_index(self) -> TranslationIndex:
         dictionaries: StenoDictionaryCollection = self.engine.dictionaries
+        return build_index(
+            dictionaries.dicts,
+            strip_accents=self.config.strip_accents,
+            stroke_formatter=self._stroke_formatter,
+            translation_formatter=self._translation_formatter
+        )
+
+    def lookup_shortest(self, word: str) -> Optional[OUTLINE_TYPE]:
+        if self._index is not None:
+            return self._index.shortest(word)
+
+        if self._shortest_outlines is not None:
+            return self._shortest_outlines.get(normalize_key(word, self.config.strip_accents))
+
+        return None
 
-        dictionary: StenoDictionary
-        for dictionary in dictionaries.dicts:
-            if dictionary.enabled:
-                for outline, translation in dictionary.items():
-                    self._translate_tree.add_child(translation, translation.lower(), outline)
+    def on_settings(self, *args) -> None:
+        prev_config = self.config
+        super().on_settings(*args)
+
+        if self.config is prev_config:
+            return
+
+        if not self.config.prefetch:
+            self._prefetcher.clear()
+            self.page_label.setToolTip("")
+
+        # Everything except accent handling is applied at query time
+        if self.config.strip_accents != prev_config.strip_accents:
+            self.index_dictionaries()
+        else:
+            self.update_query_filter()
+
+        self.refresh_suggestions()
+        self.update_table()
 
     def on_dict_update(self) -> None: 
+        if self._unloaded:
+            return
+
+        self._dict_update_timer.start()
+
+    def apply_dict_update(self) -> None:
+        if self._unloaded:
+            return
+
         self.index_dictionaries()
+
+        if not self.is_tray_visible():
+            self._stale = True
+            return
+
+        self.refresh_suggestions()
+        self.update_table()
     
-    def on_config_changed(self) -> None:
+    def on_config_changed(self, _: dict = None) -> None:
         system_name = system.NAME
         system_mod = registry.get_plugin("system", system_name).obj
 
         self._stroke_formatter = getattr(system_mod, "WT_STROKE_FORMATTER", None)
         self._translation_formatter = getattr(system_mod, "WT_TRANSLATION_FORMATTER", None)
         self._system_sorter = getattr(system_mod, "WT_SORTER", None)
+
+        # After a system switch, dictionaries_loaded picks the right index
+        if self._index_key is None or self._index_key[0] != system_name:
+            return
+
+        if self._index.set_formatters(
+            self._stroke_formatter, 
+            self._translation_formatter
+        ):
+            # Sorted and prefetched suggestions hold the old display strings
+            self._sort_key = None
+            self._prefetcher.clear()
+            self.refresh_suggestions()
+            self.update_table()
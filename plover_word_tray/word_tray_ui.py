@@ -13,6 +13,7 @@ from plover.gui_qt.utils import ToolBar
 from plover_word_tray.resources_rc import *
 from plover_word_tray.word_tray_config import WordTrayConfig
 from plover_word_tray.config_ui import ConfigUI
+from plover_word_tray.missed_briefs_ui import MissedBriefsUI
 from plover_word_tray.sorting import SortingType
 
 
@@ -39,6 +40,17 @@ class WordTrayUI(Tool):
         if settings.contains("tolerance"):
             self.config.tolerance = settings.value("tolerance", type=int)
 
+        if settings.contains("max_strokes"):
+            self.config.max_strokes = settings.value("max_strokes", type=int)
+
+        if settings.contains("excluded_dictionaries"):
+            self.config.excluded_dictionaries = (
+                settings.value("excluded_dictionaries", type=list) or []
+            )
+
+        if settings.contains("strip_accents"):
+            self.config.strip_accents = settings.value("strip_accents", type=bool)
+
         if settings.contains("row_height"):
             self.config.row_height = settings.value("row_height", type=int)
         
@@ -50,6 +62,12 @@ class WordTrayUI(Tool):
         if settings.contains("page_len"):
             self.config.page_len = settings.value("page_len", type=int)
         
+        if settings.contains("unload_after"):
+            self.config.unload_after = settings.value("unload_after", type=int)
+
+        if settings.contains("prefetch"):
+            self.config.prefetch = settings.value("prefetch", type=bool)
+
         if settings.contains("sorting_type"):
             self.config.sorting_type = SortingType(settings.value("sorting_type", type=int))
         
@@ -60,9 +78,14 @@ class WordTrayUI(Tool):
         settings.setValue("to_pseudo", self.config.to_pseudo)
         settings.setValue("show_both", self.config.show_both)
         settings.setValue("tolerance", self.config.tolerance)
+        settings.setValue("max_strokes", self.config.max_strokes)
+        settings.setValue("excluded_dictionaries", self.config.excluded_dictionaries)
+        settings.setValue("strip_accents", self.config.strip_accents)
         settings.setValue("row_height", self.config.row_height)
         settings.setValue("pinned", self.pin_action.isChecked())
         settings.setValue("page_len", self.config.page_len)
+        settings.setValue("unload_after", self.config.unload_after)
+        settings.setValue("prefetch", self.config.prefetch)
         settings.setValue("sorting_type", self.config.sorting_type.value)
 
     def show_window(self) -> None:
@@ -106,6 +129,13 @@ class WordTrayUI(Tool):
         self.settings_action.triggered.connect(self.on_settings)
         self.settings_action.setShortcut(QKeySequence("Ctrl+S"))
 
+        self.missed_briefs_action = QAction(self)
+        self.missed_briefs_action.setText("Missed briefs")
+        self.missed_briefs_action.setToolTip("Show words written in more strokes than needed.")
+        self.missed_briefs_action.setIcon(QIcon(":/word_tray/bar_chart.svg"))
+        self.missed_briefs_action.triggered.connect(self.on_missed_briefs)
+        self.missed_briefs_action.setShortcut(QKeySequence("Ctrl+M"))
+
         self.page_label = QLabel(self)
         self.page_label.setText("Page 0 of 0")
         self.page_label.setAlignment(Qt.AlignHCenter)
@@ -117,7 +147,8 @@ class WordTrayUI(Tool):
         self.layout.addWidget(self.suggestions_table, 3, 0, 1, 2)
         self.layout.addWidget(ToolBar(
             self.pin_action,
-            self.settings_action
+            self.settings_action,
+            self.missed_briefs_action
         ), 4, 0)
         self.layout.addWidget(self.page_label, 4, 1)
         self.setLayout(self.layout)
@@ -136,7 +167,8 @@ class WordTrayUI(Tool):
         self.show()
 
     def on_settings(self, *args) -> None:
-        config_dialog = ConfigUI(self.config.copy(), self)
+        dictionary_paths = [d.path for d in self.engine.dictionaries.dicts]
+        config_dialog = ConfigUI(self.config.copy(), dictionary_paths, self)
         if config_dialog.exec():
             self.config = config_dialog.temp_config
             self.suggestions_table.setRowCount(self.config.page_len)
@@ -144,5 +176,9 @@ class WordTrayUI(Tool):
             self.suggestions_table.verticalHeader().setDefaultSectionSize(self.config.row_height)
             self.suggestions_table.setMinimumHeight(self.config.row_height * self.config.page_len + self.config.row_height)
 
+    def on_missed_briefs(self, *args) -> None:
+        missed_briefs_dialog = MissedBriefsUI(self.missed_briefs, self)
+        missed_briefs_dialog.exec()
+
     def get_word_tray_config(self) -> WordTrayConfig:
         return self.config
@@ -0,0 +1,103 @@
+import pytest
+
+from plover import system
+from plover.config import DEFAULT_UNDO_LEVELS
+from plover.formatting import Formatter
+from plover.registry import registry
+from plover.steno import Stroke
+from plover.steno_dictionary import StenoDictionary, StenoDictionaryCollection
+from plover.translation import Translator
+
+from plover_word_tray.missed_briefs import MissedBriefTracker
+from plover_word_tray.word_tracker import WordTracker
+
+
+DICTIONARY = {
+    ("KAT",): "cat",
+    ("KA", "T"): "cat",
+    ("KAGT",): "catting",
+    ("TKOG",): "dog",
+    ("-G",): "{^ing}",
+    ("KR*",): "{&c}",
+    ("A*",): "{&a}",
+    ("T*",): "{&t}",
+    ("TP-PL",): "{.}",
+    ("KW-BG",): "{,}",
+    ("KW-GS",): "{~|\"^}",
+}
+
+SHORTEST = {"cat": ("KAT",), "catting": ("KAGT",), "dog": ("TKOG",)}
+
+
+class Output:
+    def send_backspaces(self, count: int) -> None:
+        pass
+
+    def send_string(self, text: str) -> None:
+        pass
+
+    def send_key_combination(self, combo: str) -> None:
+        pass
+
+    def send_engine_command(self, command: str) -> None:
+        pass
+
+
+@pytest.fixture(scope="module", autouse=True)
+def english_system():
+    registry.update()
+    system.setup("English Stenotype")
+
+
+def run_strokes(strokes):
+    dictionary = StenoDictionary()
+    dictionary.update(DICTIONARY)
+
+    formatter = Formatter()
+    formatter.set_output(Output())
+
+    translator = Translator()
+    translator.set_min_undo_length(DEFAULT_UNDO_LEVELS)
+    translator.add_listener(formatter.format)
+    translator.set_dictionary(StenoDictionaryCollection([dictionary]))
+
+    # Fed the same way WordTraySuggestions.on_stroke feeds it
+    word_tracker = WordTracker()
+    tracker = MissedBriefTracker(SHORTEST.get)
+    for steno in strokes:
+        translator.translate(Stroke.from_steno(steno))
+        prev_translations = translator.get_state().prev()
+        curr_word = word_tracker.update(prev_translations)
+        if curr_word is not None:
+            tracker.update(prev_translations[-1], curr_word)
+
+    return {
+        missed.word: (missed.count, missed.extra_strokes)
+        for missed in tracker.top_offenders(10)
+    }
+
+
+@pytest.mark.parametrize("strokes, expected", [
+    # Fingerspelling, finished by the next word
+    (["KR*", "A*", "T*", "TKOG", "KAT"], {"cat": (1, 2)}),
+    # Briefs and multi-stroke outlines
+    (["KAT", "TKOG", "KA", "T", "TKOG"], {"cat": (1, 1)}),
+    # Suffixes count towards the word they attach to
+    (["KAT", "-G", "TKOG"], {"catting": (1, 1)}),
+    (["KAGT", "TKOG"], {}),
+    # Trailing punctuation finishes the word without counting its strokes
+    (["KR*", "A*", "T*", "TP-PL"], {"cat": (1, 2)}),
+    (["KR*", "A*", "T*", "KW-BG", "TKOG"], {"cat": (1, 2)}),
+    (["KA", "T", "TP-PL", "TKOG"], {"cat": (1, 1)}),
+    (["KA", "T", "TP-PL", "TP-PL", "KW-BG"], {"cat": (1, 1)}),
+    # Leading punctuation isn't part of the next word either
+    (["KW-GS", "KA", "T", "TKOG"], {"cat": (1, 1)}),
+    # Undoing the punctuation or the next word doesn't count the word twice
+    (["KR*", "A*", "T*", "TP-PL", "*", "TP-PL", "TKOG"], {"cat": (1, 2)}),
+    (["KR*", "A*", "T*", "TKOG", "*", "TKOG", "KAT"], {"cat": (1, 2)}),
+    (["KR*", "A*", "T*", "TP-PL", "KAT", "*", "*", "KW-BG"], {"cat": (1, 2)}),
+    # Undoing inside the word only counts the strokes that are left
+    (["KR*", "A*", "*", "A*", "T*", "TKOG"], {"cat": (1, 2)}),
+])
+def test_missed_briefs(strokes, expected):
+    assert run_strokes(strokes) == expected
@@ -0,0 +1,131 @@
+import random
+
+import pytest
+
+from plover import system
+from plover.config import DEFAULT_UNDO_LEVELS
+from plover.formatting import Formatter
+from plover.registry import registry
+from plover.steno import Stroke
+from plover.steno_dictionary import StenoDictionary, StenoDictionaryCollection
+from plover.translation import Translator
+
+from plover_word_tray.word_tracker import WordTracker, fragment_word
+
+
+DICTIONARY = {
+    ("KAT",): "cat",
+    ("PHAEUBG",): "make",
+    ("-G",): "{^ing}",
+    ("-S",): "{^s}",
+    ("A*",): "{&a}",
+    ("PW*",): "{&b}",
+    ("R-R",): "{^\n^}",
+    ("TP-PL",): "{.}",
+    ("KW-BG",): "{,}",
+    ("KPA",): "{-|}",
+    ("TK-LS",): "{^^}",
+    ("KAT", "TKOG"): "catdog",
+    ("TKOG",): "dog",
+    ("TH",): "this is",
+}
+
+SEQUENCES = {
+    "words": ["KAT", "TKOG", "TH", "PHAEUBG"],
+    "suffixes": ["PHAEUBG", "-G", "KAT", "-S", "-G"],
+    "glue": ["A*", "PW*", "A*", "KAT", "A*", "PW*"],
+    "newline": ["KAT", "R-R", "TKOG", "R-R", "R-R", "KAT"],
+    "undo": ["KAT", "-G", "*", "*", "TKOG", "A*", "PW*", "*", "*", "*", "KAT"],
+    "multi_stroke": ["KAT", "TKOG", "*", "TKOG", "KAT", "*", "*"],
+    "punctuation": ["KAT", "TP-PL", "KPA", "TKOG", "KW-BG", "TK-LS", "KAT"],
+}
+
+
+class Output:
+    def __init__(self) -> None:
+        self.text = ""
+
+    def send_backspaces(self, count: int) -> None:
+        self.text = self.text[:-count]
+
+    def send_string(self, text: str) -> None:
+        self.text += text
+
+    def send_key_combination(self, combo: str) -> None:
+        pass
+
+    def send_engine_command(self, command: str) -> None:
+        pass
+
+
+def expected_word(prev_translations):
+    # fragment_word plus the whole-translation rule on_stroke always had
+    word = fragment_word(prev_translations)
+    if word is None:
+        return None
+
+    last_translation = prev_translations[-1].english
+    if last_translation is not None:
+        if (
+            last_translation.replace(" ", "").isalnum()
+            and len(last_translation) > len(word)
+        ):
+            word = last_translation.strip()
+
+    return word
+
+
+@pytest.fixture(scope="module", autouse=True)
+def english_system():
+    registry.update()
+    system.setup("English Stenotype")
+
+
+def make_translator(space_placement: str) -> Translator:
+    dictionary = StenoDictionary()
+    dictionary.update(DICTIONARY)
+
+    formatter = Formatter()
+    formatter.set_output(Output())
+    formatter.set_space_placement(space_placement)
+
+    translator = Translator()
+    translator.set_min_undo_length(DEFAULT_UNDO_LEVELS)
+    translator.add_listener(formatter.format)
+    translator.set_dictionary(StenoDictionaryCollection([dictionary]))
+    return translator
+
+
+def run_strokes(strokes, space_placement: str) -> WordTracker:
+    translator = make_translator(space_placement)
+    tracker = WordTracker()
+
+    for steno in strokes:
+        translator.translate(Stroke.from_steno(steno))
+        prev_translations = translator.get_state().prev()
+        if not prev_translations:
+            continue
+
+        expected = expected_word(prev_translations)
+        assert tracker.update(prev_translations) == expected, steno
+
+    return tracker
+
+
+@pytest.mark.parametrize("space_placement", ["Before Output", "After Output"])
+@pytest.mark.parametrize("name", sorted(SEQUENCES))
+def test_matches_fragment_word(name, space_placement):
+    # Lead in with a word, as there always is one in a real session's history
+    tracker = run_strokes(["TH"] + SEQUENCES[name], space_placement)
+
+    # Only the first stroke and strokes after undoing everything need a full pass
+    assert tracker.incremental_updates > tracker.full_updates
+
+
+@pytest.mark.parametrize("space_placement", ["Before Output", "After Output"])
+def test_matches_fragment_word_random(space_placement):
+    rng = random.Random(0)
+    strokes = [steno for outline in DICTIONARY for steno in outline] + ["*"] * 4
+
+    tracker = run_strokes([rng.choice(strokes) for _ in range(2000)], space_placement)
+    assert tracker.full_updates < tracker.incremental_updates / 20